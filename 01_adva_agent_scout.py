@@ -11,6 +11,12 @@ AdvaScout AI Agent (Data Acquisition)
 
 Použitie z CLI:
     python adva_scout_agent.py job_input.json
+    python adva_scout_agent.py --bulk jobs.jsonl --output results.jsonl --workers 8
+
+Bulk režim:
+- jobs.jsonl = jeden job (formát ako nižšie) na riadok
+- results.jsonl = {"line", "job_id", "status", "result" | "error"} na riadok
+- results.jsonl.checkpoint.json = progres; opätovné spustenie pokračuje od miesta prerušenia
 
 Format job_input.json:
 {
@@ -32,20 +38,31 @@ Format job_input.json:
     "kpi": ["bookings", "conversion_rate"],
     "brand_tone": "friendly, expert, human",
     "notes": "We want to look modern but trustworthy."
-  }
+  },
+  "profile": false
 }
 
+"profile" je voliteľný: true | "cpu" | "mem" (viď adva_scout_profiling.py).
+
 Výstup:
 - out_basic/<safe_job_id>.adva_scout.json
+- out_basic/<safe_job_id>.prof (profilovanie "cpu") alebo
+  out_basic/<safe_job_id>.tracemalloc + .memory.json (profilovanie "mem"),
+  len ak je profilovanie zapnuté, viď adva_scout_profiling.py
 """
 
+import argparse
 import json
+import os
 import pathlib
 import re
 import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
+from adva_scout_profiling import idle, profile_job, track_activity
 from p01_data_acquisition import nacitaj_html, extrahuj_texty
 
 OUT_DIR = pathlib.Path("out_basic")
@@ -121,13 +138,20 @@ def process_uploaded_documents(uploaded_docs: List[Dict[str, Any]]) -> List[Dict
     return docs_out
 
 
-def run_scout(job: Dict[str, Any]) -> Dict[str, Any]:
+def run_scout(job: Dict[str, Any], verbose: bool = True) -> Dict[str, Any]:
     """
     Hlavná funkcia AdvaScout agenta.
 
     Vstup: job dict (client_url, competitor_urls, uploaded_docs, client_form)
     Výstup: jeden JSON payload pre AdvaBrief + uloženie do out_basic/
+    verbose=False vypne výpis po každom jobe (bulk režim)
     """
+    # celý job (aj zápis JSON-u) sa počíta ako práca - kvôli "exclusive" v pamäťových profiloch
+    with track_activity():
+        return _run_scout(job, verbose)
+
+
+def _run_scout(job: Dict[str, Any], verbose: bool) -> Dict[str, Any]:
     OUT_DIR.mkdir(exist_ok=True)
 
     job_id = job.get("job_id") or f"scout-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}"
@@ -135,15 +159,17 @@ def run_scout(job: Dict[str, Any]) -> Dict[str, Any]:
     competitor_urls = job.get("competitor_urls", []) or []
     uploaded_docs = job.get("uploaded_docs", []) or []
     client_form = job.get("client_form", {}) or {}
+    safe_job_id = _safe_id(job_id)
 
-    # 1) klient
-    client_data = process_url(client_url)
+    with profile_job(job, safe_job_id, OUT_DIR, verbose=verbose):
+        # 1) klient
+        client_data = process_url(client_url)
 
-    # 2) konkurencia
-    competitors_data = process_competitors(competitor_urls)
+        # 2) konkurencia
+        competitors_data = process_competitors(competitor_urls)
 
-    # 3) dokumenty (stub)
-    docs_data = process_uploaded_documents(uploaded_docs)
+        # 3) dokumenty (stub)
+        docs_data = process_uploaded_documents(uploaded_docs)
 
     # 4) result payload
     result: Dict[str, Any] = {
@@ -160,22 +186,229 @@ def run_scout(job: Dict[str, Any]) -> Dict[str, Any]:
         },
     }
 
-    safe_job_id = _safe_id(job_id)
     out_path = OUT_DIR / f"{safe_job_id}.adva_scout.json"
     out_path.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
 
-    print(f"[AdvaScout] Job {job_id} completed.")
-    print(f"[AdvaScout] JSON uložený do: {out_path}")
+    if verbose:
+        print(f"[AdvaScout] Job {job_id} completed.")
+        print(f"[AdvaScout] JSON uložený do: {out_path}")
 
     return result
 
 
+def _job_from_line(raw: str, line_no: int, default_prefix: str) -> Dict[str, Any]:
+    """Naparsuje jeden riadok JSONL. Job bez job_id dostane stabilné ID podľa čísla riadku
+    (timestamp z run_scout by sa pri paralelnom behu opakoval a prepisoval výstupy)."""
+    job = json.loads(raw)
+    if not isinstance(job, dict):
+        raise ValueError("job musí byť JSON objekt")
+    if not job.get("job_id"):
+        job["job_id"] = f"{default_prefix}-{line_no}"
+    return job
+
+
+def _run_bulk_job(raw: str, line_no: int, default_prefix: str) -> Dict[str, Any]:
+    """Spracuje jeden riadok vstupu a vráti záznam pre výstupný JSONL (chyby sa nevyhadzujú)."""
+    job_id = None
+    with track_activity():
+        try:
+            job = _job_from_line(raw, line_no, default_prefix)
+            job_id = job["job_id"]
+            result = run_scout(job, verbose=False)
+            return {"line": line_no, "job_id": job_id, "status": result.get("status", "success"), "result": result}
+        except Exception as e:
+            return {"line": line_no, "job_id": job_id, "status": "error", "error": str(e)}
+
+
+def _load_checkpoint(path: pathlib.Path) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _save_checkpoint(path: pathlib.Path, state: Dict[str, Any]) -> None:
+    """Atomický zápis checkpointu (tmp + replace), aby prerušenie nenechalo rozbitý súbor."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def run_bulk(input_path: pathlib.Path, output_path: pathlib.Path, workers: int = 4) -> None:
+    """
+    Hromadný režim: streamuje joby z JSONL, spúšťa run_scout paralelne
+    a výsledky priebežne zapisuje do JSONL.
+
+    - vstup ani výstup sa nenačítavajú celé do pamäte
+      (naraz je rozpracovaných najviac 2 * workers jobov a runner nepredbehne
+      najstarší nedokončený riadok o viac ako 100 * workers riadkov)
+    - --workers 1 beží priamo v hlavnom vlákne, bez paralelnej práce -> pamäťové profily sú "exclusive"
+    - <output>.checkpoint.json drží hranicu hotových riadkov, hotové riadky nad ňou
+      a dĺžku výstupu -> prerušený beh pokračuje tam, kde skončil, bez duplicít
+    - každých pár sekúnd vypíše priepustnosť (výpisy jednotlivých jobov sú vypnuté)
+    """
+    checkpoint_path = output_path.with_name(output_path.name + ".checkpoint.json")
+    checkpoint = _load_checkpoint(checkpoint_path)
+
+    if checkpoint is not None:
+        if checkpoint.get("input") != str(input_path):
+            raise ValueError(
+                f"Checkpoint {checkpoint_path} patrí k inému vstupu ({checkpoint.get('input')}); "
+                "zmaž ho alebo zvoľ iný výstup."
+            )
+        output_offset = int(checkpoint["output_offset"])
+        output_size = output_path.stat().st_size if output_path.exists() else None
+        if output_size is None or output_size < output_offset:
+            raise ValueError(
+                f"Výstup {output_path} chýba alebo je kratší ({output_size or 0} B) ako v checkpointe "
+                f"({output_offset} B); zmaž {checkpoint_path} pre nový beh od začiatku."
+            )
+        next_line = int(checkpoint["next_line"])
+        done_above = set(checkpoint["done_above"])
+        out = output_path.open("r+b")
+        # zahodíme výsledky zapísané po poslednom checkpointe - tie joby pobežia znova
+        out.truncate(output_offset)
+        out.seek(0, os.SEEK_END)
+        print(f"[AdvaScout] Pokračujem od riadku {next_line} (checkpoint {checkpoint_path}).")
+    else:
+        next_line = 0
+        done_above = set()
+        out = output_path.open("wb")
+
+    default_prefix = _safe_id(input_path.stem)
+    max_pending = max(1, workers) * 2
+    # jeden zaseknutý job nesmie nechať done_above (a checkpoint) rásť bez hranice
+    max_ahead = max(1, workers) * 100
+    pending: Dict[Future, int] = {}
+    completed = errors = 0
+    started = last_report = last_checkpoint = time.monotonic()
+
+    def mark_done(line_no: int) -> None:
+        nonlocal next_line
+        done_above.add(line_no)
+        while next_line in done_above:
+            done_above.remove(next_line)
+            next_line += 1
+
+    # posledný konzistentný stav (offset, next_line, done_above) - Ctrl-C môže prísť
+    # medzi zápisom riadku a mark_done, preto sa pri prerušení ukladá len tento
+    consistent = (out.tell(), next_line, frozenset(done_above))
+
+    def remember_state() -> None:
+        nonlocal consistent
+        consistent = (out.tell(), next_line, frozenset(done_above))
+
+    def checkpoint_now() -> None:
+        output_offset, saved_next_line, saved_done_above = consistent
+        out.flush()
+        os.fsync(out.fileno())
+        _save_checkpoint(
+            checkpoint_path,
+            {
+                "input": str(input_path),
+                "next_line": saved_next_line,
+                "done_above": sorted(saved_done_above),
+                "output_offset": output_offset,
+            },
+        )
+
+    def collect(block: bool) -> None:
+        nonlocal completed, errors, last_report, last_checkpoint
+        if not pending:
+            return
+        with idle():
+            finished, _ = wait(list(pending), timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        for fut in finished:
+            line_no = pending.pop(fut)
+            record = fut.result()
+            out.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+            mark_done(line_no)
+            remember_state()
+            completed += 1
+            if record["status"] == "error":
+                errors += 1
+
+        now = time.monotonic()
+        if now - last_checkpoint >= 1.0:
+            checkpoint_now()
+            last_checkpoint = now
+        if now - last_report >= 5.0:
+            rate = completed / max(now - started, 1e-9)
+            print(f"[AdvaScout] Bulk: {completed} hotových ({errors} chýb), {rate:.2f} jobov/s, v behu {len(pending)}")
+            last_report = now
+
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+
+    def submit(raw: str, line_no: int) -> Future:
+        if workers > 1:
+            return executor.submit(_run_bulk_job, raw, line_no, default_prefix)
+        # jeden worker = priamo v hlavnom vlákne, nič iné pritom nebeží
+        fut: Future = Future()
+        fut.set_result(_run_bulk_job(raw, line_no, default_prefix))
+        return fut
+
+    # hlavné vlákno (čítanie vstupu, zápis výstupu) tiež alokuje - mimo čakania sa počíta ako práca
+    with track_activity():
+        try:
+            with input_path.open("r", encoding="utf-8") as f:
+                for line_no, raw in enumerate(f):
+                    if line_no < next_line or line_no in done_above:
+                        continue
+                    if not raw.strip():
+                        mark_done(line_no)
+                        remember_state()
+                        continue
+                    while pending and (len(pending) >= max_pending or line_no - next_line >= max_ahead):
+                        collect(block=True)
+                    pending[submit(raw, line_no)] = line_no
+                    collect(block=False)
+
+            while pending:
+                collect(block=True)
+        except KeyboardInterrupt:
+            print("[AdvaScout] Prerušené - ukladám checkpoint, rozpracované joby pobežia pri ďalšom spustení.")
+            sys.exit(130)
+        finally:
+            checkpoint_now()
+            out.close()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    elapsed = time.monotonic() - started
+    print(
+        f"[AdvaScout] Bulk hotový: {completed} jobov ({errors} chýb) za {elapsed:.1f} s, "
+        f"{completed / max(elapsed, 1e-9):.2f} jobov/s. Výstup: {output_path}"
+    )
+
+
 def main() -> None:
-    if len(sys.argv) != 2:
+    parser = argparse.ArgumentParser(
+        description="AdvaScout AI Agent - jeden job (job_input.json) alebo hromadne (--bulk jobs.jsonl)."
+    )
+    parser.add_argument("job_input", nargs="?", help="job_input.json pre jeden job")
+    parser.add_argument("--bulk", metavar="JOBS_JSONL", help="JSONL so vstupnými jobmi (jeden job na riadok)")
+    parser.add_argument("--output", metavar="RESULTS_JSONL", help="výstupný JSONL (default: <JOBS_JSONL>.results.jsonl)")
+    parser.add_argument("--workers", type=int, default=4, help="počet paralelných jobov v bulk režime (default: 4)")
+    args = parser.parse_args()
+
+    if args.bulk:
+        input_path = pathlib.Path(args.bulk)
+        if not input_path.exists():
+            print(f"Bulk input file neexistuje: {input_path}")
+            sys.exit(1)
+        output_path = pathlib.Path(args.output) if args.output else input_path.with_suffix(".results.jsonl")
+        try:
+            run_bulk(input_path, output_path, args.workers)
+        except ValueError as e:
+            # nekonzistentný checkpoint - radšej skončíme, než by sme pokazili výstup
+            print(f"[AdvaScout] {e}")
+            sys.exit(1)
+        return
+
+    if not args.job_input:
         print("Použitie: python adva_scout_agent.py job_input.json")
+        print("          python adva_scout_agent.py --bulk jobs.jsonl [--output results.jsonl] [--workers 4]")
         sys.exit(1)
 
-    job_path = pathlib.Path(sys.argv[1])
+    job_path = pathlib.Path(args.job_input)
     if not job_path.exists():
         print(f"Job input file neexistuje: {job_path}")
         sys.exit(1)
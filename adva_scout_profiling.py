@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+AdvaScout profiling (on-demand)
+-------------------------------
+
+Úloha:
+- Voliteľne odprofiluje jeden beh run_scout(job) – CPU (cProfile) + alokácie (tracemalloc)
+- Profily uloží vedľa Content Packu v out_basic/ pod rovnakým job ID
+- CLI vypíše top hotspoty a najväčšie alokácie naprieč všetkými uloženými profilmi
+
+Zapnutie:
+- v job_input.json:                 "profile": true | "cpu" | "mem"
+- pre všetky joby:                  ADVA_SCOUT_PROFILE=1 | cpu | mem
+- náhodný výber (sampling 0.0–1.0): ADVA_SCOUT_PROFILE_SAMPLE=0.05
+                                    (+ ADVA_SCOUT_PROFILE_SAMPLE_KIND=cpu | mem)
+
+CPU (cProfile) a pamäť (tracemalloc) sa merajú v samostatných behoch, nikdy naraz:
+tracemalloc výrazne spomalí kód (a skreslí hotspoty) a cProfile si alokuje vlastné
+záznamy, ktoré by sa pripísali jobu. true / 1 znamená "cpu".
+
+Naraz sa profiluje len jeden job. Flagnuté joby (job / ADVA_SCOUT_PROFILE) počkajú,
+kým sa profiler uvoľní; samplované joby sa vtedy preskočia (s hláškou).
+
+tracemalloc sleduje celý proces: ak počas "mem" profilu pracovalo aj iné vlákno
+(iný job, zápis výsledkov v --bulk), profil je v .memory.json označený
+"exclusive": false a súhrn alokácií ho vynechá. Spoľahlivé alokácie -> --workers 1.
+Kým beží "mem" profil, sú spomalené aj ostatné vlákna procesu.
+
+Výstup (pre job "demo-001"):
+- out_basic/demo_001.prof           – "cpu": pstats súbor (dá sa otvoriť aj v snakeviz)
+- out_basic/demo_001.tracemalloc    – "mem": tracemalloc snapshot (stav na konci jobu)
+- out_basic/demo_001.memory.json    – "mem": peak/aktuálna pamäť počas jobu (vrátane dočasných alokácií)
+
+Použitie z CLI:
+    python adva_scout_profiling.py [out_basic] [--top 20]
+"""
+
+import argparse
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pathlib
+import pstats
+import random
+import threading
+import tracemalloc
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+PROFILE_SUFFIX = ".prof"
+ALLOC_SUFFIX = ".tracemalloc"
+MEMORY_SUFFIX = ".memory.json"
+
+PROFILE_KINDS = ("cpu", "mem")
+
+# cProfile aj tracemalloc sú globálne pre proces – naraz profilujeme len jeden job
+_PROFILE_LOCK = threading.Lock()
+
+# počítadlo vlákien, ktoré práve robia prácu (job, zápis výstupu...), aby sme vedeli,
+# či alokácie v snapshote patria len profilovanému jobu
+_STATE_LOCK = threading.Lock()
+_active_jobs = 0
+_profiling = False
+_profile_overlap = False
+_local = threading.local()
+
+
+def _kind(value: Any, default: str = "cpu") -> str:
+    """true / "1" -> default, "cpu" / "mem" -> tak ako sú."""
+    value = str(value).strip().lower()
+    return value if value in PROFILE_KINDS else default
+
+
+def profiling_mode(job: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """
+    Rozhodne, či a ako sa má daný job profilovať. Vráti (mode, kind) alebo None.
+
+    mode:
+    - "flagged" – "profile" v jobe alebo ADVA_SCOUT_PROFILE (profil sa zachytí vždy, job počká na profiler)
+    - "sampled" – náhodný výber cez ADVA_SCOUT_PROFILE_SAMPLE (ak je profiler obsadený, preskočí sa)
+
+    kind:
+    - "cpu" – cProfile (default)
+    - "mem" – tracemalloc (peak + snapshot)
+    CPU a pamäť sa nikdy nemerajú naraz – tracemalloc by skreslil časy a cProfile alokácie.
+    """
+    flag = job.get("profile")
+    if flag:
+        return "flagged", _kind(flag)
+
+    env_flag = os.getenv("ADVA_SCOUT_PROFILE", "").strip().lower()
+    if env_flag in {"1", "true", "yes", *PROFILE_KINDS}:
+        return "flagged", _kind(env_flag)
+
+    try:
+        sample_rate = float(os.getenv("ADVA_SCOUT_PROFILE_SAMPLE", "0") or 0)
+    except ValueError:
+        return None
+    if sample_rate > 0 and random.random() < sample_rate:
+        return "sampled", _kind(os.getenv("ADVA_SCOUT_PROFILE_SAMPLE_KIND", "cpu"))
+    return None
+
+
+def _enter_job() -> None:
+    global _active_jobs, _profile_overlap
+    with _STATE_LOCK:
+        _active_jobs += 1
+        if _profiling:
+            _profile_overlap = True
+
+
+def _leave_job() -> None:
+    global _active_jobs
+    with _STATE_LOCK:
+        _active_jobs -= 1
+
+
+@contextlib.contextmanager
+def track_activity() -> Iterator[None]:
+    """
+    Označí aktuálne vlákno ako pracujúce (celý run_scout, zápis výsledkov v bulk režime...).
+    Vnorené volania v tom istom vlákne sa počítajú raz.
+    """
+    depth = getattr(_local, "depth", 0)
+    if depth == 0:
+        _enter_job()
+    _local.depth = depth + 1
+    try:
+        yield
+    finally:
+        _local.depth = depth
+        if depth == 0:
+            _leave_job()
+
+
+@contextlib.contextmanager
+def idle() -> Iterator[None]:
+    """Dočasne vyradí aktuálne vlákno z track_activity (napr. počas čakania na iné vlákno)."""
+    depth = getattr(_local, "depth", 0)
+    if depth:
+        _local.depth = 0
+        _leave_job()
+    try:
+        yield
+    finally:
+        if depth:
+            _enter_job()
+            _local.depth = depth
+
+
+def _start_profiling() -> None:
+    global _profiling, _profile_overlap
+    with _STATE_LOCK:
+        _profiling = True
+        _profile_overlap = _active_jobs > 1
+
+
+def _stop_profiling() -> bool:
+    """Vráti True, ak počas profilovania nepracovalo žiadne iné vlákno."""
+    global _profiling
+    with _STATE_LOCK:
+        _profiling = False
+        return not _profile_overlap
+
+
+def _dump_cpu(safe_job_id: str, out_dir: pathlib.Path, profiler: cProfile.Profile, verbose: bool) -> None:
+    """Zapíše CPU profil. Chyba zápisu nesmie zhodiť job - je to len diagnostika."""
+    try:
+        out_dir.mkdir(exist_ok=True)
+        prof_path = out_dir / f"{safe_job_id}{PROFILE_SUFFIX}"
+        profiler.dump_stats(str(prof_path))
+    except Exception as e:
+        print(f"[AdvaScout] VAROVANIE: CPU profil pre {safe_job_id} sa nepodarilo uložiť: {e}")
+        return
+
+    if verbose:
+        print(f"[AdvaScout] CPU profil uložený do: {prof_path}")
+
+
+def _dump_memory(safe_job_id: str, out_dir: pathlib.Path, exclusive: bool, verbose: bool) -> None:
+    """Zapíše peak pamäte + tracemalloc snapshot. Volá sa, kým tracemalloc ešte beží."""
+    try:
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            ]
+        )
+        memory = {
+            "job_id": safe_job_id,
+            "peak_bytes": peak_bytes,
+            "current_bytes": current_bytes,
+            "exclusive": exclusive,
+        }
+        out_dir.mkdir(exist_ok=True)
+        alloc_path = out_dir / f"{safe_job_id}{ALLOC_SUFFIX}"
+        memory_path = out_dir / f"{safe_job_id}{MEMORY_SUFFIX}"
+        snapshot.dump(str(alloc_path))
+        memory_path.write_text(json.dumps(memory, indent=2), encoding="utf-8")
+    except Exception as e:
+        print(f"[AdvaScout] VAROVANIE: pamäťový profil pre {safe_job_id} sa nepodarilo uložiť: {e}")
+        return
+
+    if verbose:
+        print(f"[AdvaScout] Pamäťový profil uložený do: {alloc_path}, {memory_path}")
+    if not exclusive:
+        print(
+            f"[AdvaScout] VAROVANIE: počas profilovania {safe_job_id} pracovali aj iné vlákna - "
+            "alokácie a peak pamäte nie sú len z tohto jobu (použi --workers 1)."
+        )
+
+
+@contextlib.contextmanager
+def profile_job(
+    job: Dict[str, Any],
+    safe_job_id: str,
+    out_dir: pathlib.Path,
+    verbose: bool = True,
+) -> Iterator[None]:
+    """
+    Obalí blok kódu profilerom, ak je profilovanie pre job zapnuté.
+    Inak je to no-op, takže bežný beh nič nestojí.
+    Profiler, ktorý sa nepodarí spustiť alebo uložiť, job nezhodí - len vypíše varovanie.
+    """
+    requested = profiling_mode(job)
+    if requested is None:
+        with track_activity():
+            yield
+        return
+
+    mode, kind = requested
+    # čakajúci job nepracuje - nesmie pokaziť "exclusive" práve bežiaceho profilu
+    with idle():
+        profiling = _PROFILE_LOCK.acquire(blocking=(mode == "flagged"))
+    if not profiling:
+        if verbose:
+            print(f"[AdvaScout] Profil pre {safe_job_id} preskočený - práve sa profiluje iný job.")
+        with track_activity():
+            yield
+        return
+
+    try:
+        with track_activity():
+            _start_profiling()
+            profiler: Optional[cProfile.Profile] = None
+            started_tracemalloc = False
+            running = False
+            try:
+                try:
+                    if kind == "cpu":
+                        profiler = cProfile.Profile()
+                        profiler.enable()
+                    else:
+                        started_tracemalloc = not tracemalloc.is_tracing()
+                        if started_tracemalloc:
+                            # 1 frame stačí na súhrn podľa riadku a je najlacnejší
+                            tracemalloc.start(1)
+                        tracemalloc.reset_peak()
+                    running = True
+                except Exception as e:
+                    print(f"[AdvaScout] VAROVANIE: profiler ({kind}) pre {safe_job_id} sa nepodarilo spustiť: {e}")
+
+                yield
+            finally:
+                if running and profiler is not None:
+                    profiler.disable()
+                exclusive = _stop_profiling()
+                if running and profiler is not None:
+                    _dump_cpu(safe_job_id, out_dir, profiler, verbose)
+                if running and kind == "mem":
+                    _dump_memory(safe_job_id, out_dir, exclusive, verbose)
+                if started_tracemalloc:
+                    tracemalloc.stop()
+    finally:
+        _PROFILE_LOCK.release()
+
+
+def summarize_cpu(paths: List[pathlib.Path], top: int) -> str:
+    """Zlúči všetky .prof súbory a vráti top funkcie podľa kumulatívneho času."""
+    stream = io.StringIO()
+    stats: Optional[pstats.Stats] = None
+    for p in paths:
+        if stats is None:
+            stats = pstats.Stats(str(p), stream=stream)
+        else:
+            stats.add(str(p))
+    if stats is None:
+        return "(žiadne CPU profily)\n"
+
+    stats.strip_dirs().sort_stats("cumulative").print_stats(top)
+    return stream.getvalue()
+
+
+def _load_memory(alloc_path: pathlib.Path) -> Dict[str, Any]:
+    """Načíta <job>.memory.json patriaci k danému snapshotu (prázdny dict, ak chýba)."""
+    memory_path = alloc_path.with_name(alloc_path.name[: -len(ALLOC_SUFFIX)] + MEMORY_SUFFIX)
+    if not memory_path.exists():
+        return {}
+    return json.loads(memory_path.read_text(encoding="utf-8"))
+
+
+def summarize_peaks(paths: List[pathlib.Path], top: int) -> str:
+    """Vráti joby s najväčším peakom pamäte (zachytáva aj dočasné alokácie, ktoré snapshot nevidí)."""
+    rows = []
+    for p in paths:
+        memory = json.loads(p.read_text(encoding="utf-8"))
+        rows.append((memory.get("peak_bytes", 0), memory.get("exclusive", False), memory.get("job_id", p.stem)))
+    if not rows:
+        return "(žiadne záznamy o pamäti)\n"
+
+    lines = [f"{'peak KiB':>12} {'exclusive':>10}  job"]
+    for peak, exclusive, job_id in sorted(rows, reverse=True)[:top]:
+        lines.append(f"{peak / 1024:12.1f} {'yes' if exclusive else 'NO':>10}  {job_id}")
+    return "\n".join(lines) + "\n"
+
+
+def summarize_allocations(paths: List[pathlib.Path], top: int) -> str:
+    """
+    Sčíta alokácie zo všetkých snapshotov podľa riadku kódu a vráti tie najväčšie.
+    Snapshoty z jobov, počas ktorých bežali aj iné joby, sa vynechajú - obsahujú cudzie alokácie.
+    """
+    totals: Dict[str, List[int]] = {}
+    skipped = 0
+    for p in paths:
+        if not _load_memory(p).get("exclusive", False):
+            skipped += 1
+            continue
+        snapshot = tracemalloc.Snapshot.load(str(p))
+        for stat in snapshot.statistics("lineno"):
+            frame = stat.traceback[0]
+            key = f"{frame.filename}:{frame.lineno}"
+            size_count = totals.setdefault(key, [0, 0])
+            size_count[0] += stat.size
+            size_count[1] += stat.count
+
+    note = f"(vynechaných {skipped} snapshotov zo súbežných behov - pre alokácie použi --workers 1)\n" if skipped else ""
+    if not totals:
+        return note + "(žiadne alokačné snapshoty)\n"
+
+    lines = [note + f"{'KiB':>12} {'blocks':>10}  location"]
+    ranked = sorted(totals.items(), key=lambda kv: kv[1][0], reverse=True)[:top]
+    for location, (size, count) in ranked:
+        lines.append(f"{size / 1024:12.1f} {count:10d}  {location}")
+    return "\n".join(lines) + "\n"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Súhrn AdvaScout profilov (CPU hotspoty + alokácie).")
+    parser.add_argument("profile_dir", nargs="?", default="out_basic", help="priečinok s profilmi (default: out_basic)")
+    parser.add_argument("--top", type=int, default=20, help="počet riadkov v každej sekcii (default: 20)")
+    args = parser.parse_args()
+
+    profile_dir = pathlib.Path(args.profile_dir)
+    prof_paths = sorted(profile_dir.glob(f"*{PROFILE_SUFFIX}"))
+    alloc_paths = sorted(profile_dir.glob(f"*{ALLOC_SUFFIX}"))
+
+    memory_paths = sorted(profile_dir.glob(f"*{MEMORY_SUFFIX}"))
+
+    print(f"=== CPU HOTSPOTY ({len(prof_paths)} profilov) ===")
+    print(summarize_cpu(prof_paths, args.top))
+    print(f"=== PEAK PAMÄTE ({len(memory_paths)} jobov) ===")
+    print(summarize_peaks(memory_paths, args.top))
+    print(f"=== NAJVÄČŠIE ALOKÁCIE ({len(alloc_paths)} snapshotov) ===")
+    print(summarize_allocations(alloc_paths, args.top))
+
+
+if __name__ == "__main__":
+    main()